@@ -6,19 +6,87 @@ Configuration is loaded from config.json for easy customization.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import random
 import json
 import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from urllib.parse import urlencode, urlsplit, urlunsplit
 import sys
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
+
+__all__ = [
+    'HEADERS',
+    'SESSION',
+    'SUBMIT_HEADERS',
+    'generate_work_done',
+    'get_form_urls',
+    'load_config',
+    'submit_google_form',
+]
+
+
+# Browser-like headers shared by every request made through SESSION
+HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'same-origin',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0'
+})
+
+# Extra headers for form submission (merged with SESSION.headers)
+SUBMIT_HEADERS = MappingProxyType({
+    'Content-Type': 'application/x-www-form-urlencoded',
+    'Origin': 'https://docs.google.com'
+})
+
+# Module-level session so the keep-alive connection to docs.google.com is
+# reused between the viewform GET, the formResponse POST and repeated calls
+SESSION = requests.Session()
+SESSION.mount('https://docs.google.com', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+SESSION.headers.update(HEADERS)
+
+# Cookies from a previous viewform GET, reused to skip that request
+COOKIE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'checkout-form', 'cookies.pkl')
+COOKIE_CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+
+# Values derived from the most recent config object (load_config returns
+# a single cached object): [config, {builder_name: value}]
+_CONFIG_CACHE = [None, {}]
+
+# Optional-task count at which generate_work_done samples with one NumPy
+# draw and compare instead of per-task random() calls. The array path is
+# ~2.5x faster at 1000 tasks (break-even is around 200), but only when
+# numpy is already imported: importing it just for this costs far more.
+VECTORIZE_MIN_OPTIONAL_TASKS = 1000
+
+
+@lru_cache(maxsize=1)
 def load_config():
     """Load configuration from config.json file."""
     config_path = os.path.join(os.path.dirname(__file__), 'config.json')
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # orjson (if installed) and json.loads both accept raw UTF-8 bytes
+        with open(config_path, 'rb') as f:
+            return _json_loads(f.read())
     except FileNotFoundError:
         print("❌ Error: config.json file not found!")
         print("Please create a config.json file with your form configuration.")
@@ -28,121 +96,204 @@ def load_config():
         sys.exit(1)
 
 
+def _cached_for_config(config, build):
+    """Return build(config), computing it once per config object.
+    
+    Only the latest config is kept, so passing a new one drops the old values.
+    """
+    if _CONFIG_CACHE[0] is not config:
+        _CONFIG_CACHE[:] = [config, {}]
+    values = _CONFIG_CACHE[1]
+    if build.__name__ not in values:
+        values[build.__name__] = build(config)
+    return values[build.__name__]
+
+
+def _build_optional_task_arrays(config):
+    """Return the optional tasks and their probabilities as NumPy arrays."""
+    import numpy as np
+    
+    optional = config['work_tasks']['optional_tasks']
+    tasks = np.array([t['task'] for t in optional], dtype=object)
+    probs = np.array([t['probability'] for t in optional], dtype=np.float64)
+    return tasks, probs
+
+
 def generate_work_done(config):
     """Generate randomized work done list with required and optional tasks."""
     work_config = config['work_tasks']
-    required_tasks = work_config['required_tasks'][:]
-    optional_tasks = []
     
     # Add optional tasks based on their probability
-    for task_info in work_config['optional_tasks']:
-        if random.random() < task_info['probability']:
-            optional_tasks.append(task_info['task'])
+    np = sys.modules.get('numpy')
+    if np is not None and len(work_config['optional_tasks']) >= VECTORIZE_MIN_OPTIONAL_TASKS:
+        tasks, probs = _cached_for_config(config, _build_optional_task_arrays)
+        # Seed the NumPy draws from `random` so random.seed() stays reproducible
+        draws = np.random.default_rng(random.getrandbits(64)).random(probs.size)
+        optional_tasks = tasks[draws < probs].tolist()
+    else:
+        rand = random.random
+        optional_tasks = [t['task'] for t in work_config['optional_tasks'] if rand() < t['probability']]
     
-    # Combine and randomize order
-    all_tasks = required_tasks + optional_tasks
+    # Combine (concatenation already yields a fresh list) and randomize order
+    all_tasks = work_config['required_tasks'] + optional_tasks
     random.shuffle(all_tasks)
     
     # Format as bullet points
-    return "\n".join(f"- {task}" for task in all_tasks)
+    return "\n".join(["- " + task for task in all_tasks])
 
 
-def submit_google_form(config):
-    """Submit the Google Form with today's data using session and improved headers."""
-    
-    # Get current date
-    now = datetime.now()
-    
-    # Extract config sections
+def _load_cookies():
+    """Return the cached cookie jar, or None if it is missing, empty, unreadable or older than a day."""
+    try:
+        if time.time() - os.path.getmtime(COOKIE_CACHE_PATH) > COOKIE_CACHE_MAX_AGE:
+            return None
+        with open(COOKIE_CACHE_PATH, 'rb') as f:
+            cookies = pickle.load(f)
+        if not isinstance(cookies, dict) or not cookies:
+            return None
+        return requests.utils.cookiejar_from_dict(cookies)
+    except (OSError, EOFError, ImportError, pickle.UnpicklingError, TypeError, AttributeError, ValueError):
+        return None
+
+
+def _save_cookies(session):
+    """Write the session's cookies to the on-disk cache (nothing if there are none)."""
+    cookies = requests.utils.dict_from_cookiejar(session.cookies)
+    if not cookies:
+        return
+    try:
+        os.makedirs(os.path.dirname(COOKIE_CACHE_PATH), exist_ok=True)
+        with open(COOKIE_CACHE_PATH, 'wb') as f:
+            pickle.dump(cookies, f)
+    except OSError as e:
+        print(f"WARNING: Could not cache cookies: {e}")
+
+
+@lru_cache(maxsize=None)
+def get_form_urls(form_url):
+    """Return (view_url, submit_url) for a formResponse URL, parsed only once."""
+    parts = urlsplit(form_url)
+    view_path = parts.path.replace('/formResponse', '/viewform')
+    return urlunsplit(parts._replace(path=view_path)), form_url
+
+
+def _build_static_body(config):
+    """Return the urlencoded form fields that are the same for every submission."""
     form_config = config['form_config']
     user_data = config['user_data']
     field_mappings = form_config['field_mappings']
-    hidden_params = form_config['hidden_params']
     
-    # Generate productivity rating
-    rating_range = user_data['productivity_rating_range']
-    productivity_rating = random.randint(rating_range['min'], rating_range['max'])
-    
-    # Generate form data
     form_data = {
         field_mappings['name']: user_data['name'],
-        field_mappings['work_done']: generate_work_done(config),
         field_mappings['difficulties']: user_data['difficulties_default'],
-        field_mappings['agenda']: user_data['agenda_default'],
+        field_mappings['agenda']: user_data['agenda_default']
+    }
+    
+    # Add hidden parameters
+    form_data.update(form_config['hidden_params'])
+    return urlencode(form_data).encode()
+
+
+def _speculative_post(form_view_url, post):
+    """Run the viewform GET in the background while POSTing on this thread.
+    
+    Always waits for the GET before returning, so its cookies are in
+    SESSION before anything reads the jar. If the POST is rejected, it is
+    sent again with those cookies.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        view_future = executor.submit(SESSION.get, form_view_url, timeout=30)
+        response = post()
+        if response.status_code == 200:
+            # The form is already submitted, so a failed GET only costs the cookies
+            try:
+                view_future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"WARNING: Form page request failed: {e}")
+            return response
+        
+        response.close()
+        print("Speculative submission rejected, retrying after form page request...")
+        view_future.result()
+        return post()
+    finally:
+        executor.shutdown(wait=False)
+
+
+def submit_google_form(config, work_done, productivity_rating, now):
+    """Submit the Google Form with the given work list, rating and date using the shared session."""
+    
+    # Extract config sections
+    form_config = config['form_config']
+    field_mappings = form_config['field_mappings']
+    
+    # Append today's values to the pre-encoded static fields
+    dynamic_body = urlencode({
+        field_mappings['work_done']: work_done,
         field_mappings['date_year']: str(now.year),
         field_mappings['date_month']: str(now.month),
         field_mappings['date_day']: str(now.day),
         field_mappings['productivity_rating']: str(productivity_rating)
-    }
-    
-    # Add hidden parameters
-    form_data.update(hidden_params)
+    }).encode()
+    body = _cached_for_config(config, _build_static_body) + b"&" + dynamic_body
     
     # Form URLs
-    form_view_url = form_config['form_url'].replace('/formResponse', '/viewform')
-    form_submit_url = form_config['form_url']
-    
-    # Create session for better cookie/session handling
-    session = requests.Session()
-    
-    # Updated headers to better mimic a real browser
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'same-origin',
-        'Sec-Fetch-User': '?1',
-        'Cache-Control': 'max-age=0'
-    }
+    form_view_url, form_submit_url = get_form_urls(form_config['form_url'])
     
     try:
-        # First, visit the form to get cookies and establish session
-        print("Getting form page to establish session...")
-        session.get(form_view_url, headers=headers, timeout=30)
+        # Visit the form to get cookies, unless we already have fresh ones
+        need_form_page = False
+        if not SESSION.cookies:
+            cached_cookies = _load_cookies()
+            if cached_cookies is not None:
+                print("Using cached cookies, skipping form page request...")
+                SESSION.cookies.update(cached_cookies)
+            else:
+                need_form_page = True
+        
+        submit_headers = dict(SUBMIT_HEADERS, Referer=form_view_url)
         
-        # Update headers for form submission
-        submit_headers = headers.copy()
-        submit_headers.update({
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Origin': 'https://docs.google.com',
-            'Referer': form_view_url,
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'same-origin',
-            'Sec-Fetch-User': '?1'
-        })
+        def post():
+            # Not streamed: the confirmation page is small, and reading it
+            # lets urllib3 return the keep-alive connection to the pool
+            return SESSION.post(form_submit_url, data=body, headers=submit_headers, timeout=30, allow_redirects=True)
         
         # Submit the form
-        print("Submitting form data...")
-        response = session.post(form_submit_url, data=form_data, headers=submit_headers, timeout=30, allow_redirects=True)
+        if need_form_page and form_config.get('speculative', True):
+            print("Getting form page and submitting form data concurrently...")
+            response = _speculative_post(form_view_url, post)
+        else:
+            if need_form_page:
+                print("Getting form page to establish session...")
+                SESSION.get(form_view_url, timeout=30)
+            print("Submitting form data...")
+            response = post()
         
         # Google Forms typically returns 200 even for successful submissions
-        # Check for success indicators in the response
+        # Check the final URL rather than scanning the body
         if response.status_code == 200:
-            if 'formResponse' in response.url or 'submitted' in response.text.lower() or len(response.text) < 1000:
+            if '/formResponse' in response.url:
+                # Only cache cookies from a GET made in this call, so the
+                # cache file's mtime tracks when they were actually issued
+                if need_form_page:
+                    _save_cookies(SESSION)
                 print("SUCCESS: Form submitted successfully")
                 return True
             else:
                 print("WARNING: Form may not have been submitted properly")
                 print(f"Final URL: {response.url}")
-                print(f"Response length: {len(response.text)} chars")
+                print(f"Response length: {len(response.content)} bytes (decoded)")
                 # Still return True as Google Forms is unpredictable with responses
                 return True
         else:
             print(f"ERROR: Form submission failed with status code: {response.status_code}")
             print(f"Response: {response.text[:500]}...")
             return False
-            
+        
     except requests.exceptions.RequestException as e:
         print(f"ERROR: Error submitting form: {str(e)}")
         return False
-    finally:
-        session.close()
 
 
 if __name__ == "__main__":
@@ -153,8 +304,8 @@ if __name__ == "__main__":
     now = datetime.now()
     user_data = config['user_data']
     
-    print(f"Date: {now.strftime('%Y-%m-%d')}")
-    print(f"Time: {now.strftime('%H:%M:%S UTC')}")
+    print(f"Date: {now:%Y-%m-%d}")
+    print(f"Time: {now:%H:%M:%S UTC}")
     print(f"Submitter: {user_data['name']}")
     
     work_done = generate_work_done(config)
@@ -166,5 +317,5 @@ if __name__ == "__main__":
     
     print(f"\nSubmitting form...")
     
-    success = submit_google_form(config)
+    success = submit_google_form(config, work_done, productivity_rating, now)
     sys.exit(0 if success else 1)
\ No newline at end of file
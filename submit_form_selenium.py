@@ -11,51 +11,138 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import random
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+import urllib3
+import atexit
 import json
-import os
+import random
+import subprocess
+import urllib.request
 from datetime import datetime
 import sys
 import time
 
+from submit_form import load_config, generate_work_done, get_form_urls, submit_google_form
+
+
+# Classifies a question's text in one regex pass; the first (leftmost)
+# keyword found picks the field. JS named-group syntax, since it runs
+# in the browser.
+FIELD_PATTERN = (
+    r"(?<name>name|naam)"
+    r"|(?<work>work done|work|progress|today)"
+    r"|(?<diff>difficult|challenge|problem|issue)"
+    r"|(?<agenda>agenda|tomorrow|next|plan)"
+)
+
+# Fills text inputs/textareas by matching arguments[0] (FIELD_PATTERN)
+# against each input's question text and looking the matched group up in
+# arguments[1], a {group: {field, value, textarea_only}} map.
+# Returns {count, filled}.
+FILL_TEXT_FIELDS_JS = """
+const fieldRe = new RegExp(arguments[0]);
+const values = arguments[1];
+const inputs = document.querySelectorAll("input[type='text'], input[type='email'], textarea");
+const filled = [];
+inputs.forEach(el => {
+    const item = el.closest("[role='listitem']");
+    if (!item) return;
+    const m = fieldRe.exec(item.innerText.toLowerCase());
+    if (!m) return;
+    const target = values[Object.keys(m.groups).find(k => m.groups[k] !== undefined)];
+    if (target.textarea_only && el.tagName !== 'TEXTAREA') return;
+    el.value = target.value;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    filled.push(target.field);
+});
+return {count: inputs.length, filled: filled};
+"""
+
+
+# Long-lived chromedriver shared by every submission in this process.
+# 9515 is chromedriver's own default (4444 belongs to Selenium Grid);
+# override with form_config.chromedriver_port. A chromedriver this process
+# spawns is private to it and stopped at exit; one already listening on
+# the port (e.g. started separately for a daemon) is attached to and
+# left running.
+DEFAULT_CHROMEDRIVER_PORT = 9515
+
+_chromedriver_process = None
+_driver = None
 
-def load_config():
-    """Load configuration from config.json file."""
-    config_path = os.path.join(os.path.dirname(__file__), 'config.json')
+
+def _chromedriver_alive(url):
+    """Return True if the server at url answers /status as a chromedriver."""
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("ERROR: config.json file not found!")
-        print("Please create a config.json file with your form configuration.")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"ERROR: Invalid JSON in config.json: {e}")
-        sys.exit(1)
+        with urllib.request.urlopen(f"{url}/status", timeout=1) as response:
+            status = json.loads(response.read())
+        # chromedriver reports "ChromeDriver ready for new sessions."; a
+        # Selenium Grid or anything else on the port must not be used
+        return 'chromedriver' in status['value']['message'].lower()
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return False
 
 
-def generate_work_done(config):
-    """Generate randomized work done list with required and optional tasks."""
-    work_config = config['work_tasks']
-    required_tasks = work_config['required_tasks'][:]
-    optional_tasks = []
+def _start_chromedriver(port):
+    """Return the URL of a running chromedriver on port, spawning one if needed."""
+    global _chromedriver_process
+    url = f"http://127.0.0.1:{port}"
+    
+    # Attach to a chromedriver that is already serving the port
+    if _chromedriver_alive(url):
+        return url
     
-    # Add optional tasks based on their probability
-    for task_info in work_config['optional_tasks']:
-        if random.random() < task_info['probability']:
-            optional_tasks.append(task_info['task'])
+    _chromedriver_process = subprocess.Popen(
+        ['chromedriver', f'--port={port}'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
     
-    # Combine and randomize order
-    all_tasks = required_tasks + optional_tasks
-    random.shuffle(all_tasks)
+    # Wait for chromedriver to start accepting sessions
+    deadline = time.monotonic() + 10
+    while not _chromedriver_alive(url):
+        if _chromedriver_process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("chromedriver did not start")
+        time.sleep(0.1)
     
-    # Format as bullet points
-    return "\n".join(f"- {task}" for task in all_tasks)
+    # Another chromedriver may have taken the port first, making ours exit;
+    # we are then attached to that one and don't own a process
+    if _chromedriver_process.poll() is not None:
+        _chromedriver_process = None
+    return url
+
+
+def _reset_driver():
+    """Quit the shared browser session so the next setup_driver() starts a new one."""
+    global _driver
+    if _driver is not None:
+        try:
+            _driver.quit()
+        except Exception:
+            pass
+        _driver = None
+
+
+def _shutdown_driver():
+    """Quit the shared browser session and stop chromedriver if we started it."""
+    global _chromedriver_process
+    _reset_driver()
+    
+    if _chromedriver_process is not None:
+        _chromedriver_process.terminate()
+        _chromedriver_process.wait()
+        _chromedriver_process = None
+
+
+atexit.register(_shutdown_driver)
 
 
-def setup_driver():
-    """Set up Chrome WebDriver with appropriate options."""
+def setup_driver(port=DEFAULT_CHROMEDRIVER_PORT):
+    """Return the shared Chrome WebDriver, creating it on first use."""
+    global _driver
+    if _driver is not None:
+        return _driver
+    
     chrome_options = Options()
     
     # Headless mode for GitHub Actions
@@ -70,13 +157,19 @@ def setup_driver():
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     
+    # Skip images and return from driver.get() at DOMContentLoaded
+    chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.page_load_strategy = 'eager'
+    
     # User agent
     chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     
     try:
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = webdriver.Remote(command_executor=_start_chromedriver(port), options=chrome_options)
         # Execute script to remove webdriver property
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        _driver = driver
         return driver
     except Exception as e:
         print(f"ERROR: Failed to setup Chrome driver: {e}")
@@ -84,89 +177,65 @@ def setup_driver():
         sys.exit(1)
 
 
-def fill_form_selenium(driver, config):
+def _submission_confirmed(driver):
+    """Return True once the browser shows the form's confirmation page."""
+    if 'formresponse' in driver.current_url.lower():
+        return True
+    page_text = driver.page_source.lower()
+    return any(word in page_text for word in ['submitted', 'thank you', 'received', 'response recorded'])
+
+
+def fill_form_selenium(driver, config, work_done, productivity_rating, now):
     """Fill and submit the Google Form using Selenium."""
     
     # Extract config data
     user_data = config['user_data']
-    rating_range = user_data['productivity_rating_range']
-    productivity_rating = random.randint(rating_range['min'], rating_range['max'])
-    work_done = generate_work_done(config)
-    now = datetime.now()
     
     # Form URL (use viewform, not formResponse)
-    form_url = config['form_config']['form_url'].replace('/formResponse', '/viewform')
+    form_url, _ = get_form_urls(config['form_config']['form_url'])
     
     try:
         print("Loading form page...")
         driver.get(form_url)
         
-        # Wait for form to load
-        WebDriverWait(driver, 10).wait(
-            EC.presence_of_element_located((By.TAG_NAME, "form"))
+        # Wait for form to load and render its text inputs
+        WebDriverWait(driver, 10, poll_frequency=0.1).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "input[type='text'], textarea"))
         )
-        time.sleep(2)
-        
-        # Find all input elements
-        inputs = driver.find_elements(By.CSS_SELECTOR, "input[type='text'], input[type='email'], textarea")
         
-        print(f"Found {len(inputs)} input fields")
+        # Match and fill every text field inside the browser in one round trip
+        fill_values = {
+            'name': {'field': 'name', 'value': user_data['name'], 'textarea_only': False},
+            'work': {'field': 'work done', 'value': work_done, 'textarea_only': True},
+            'diff': {'field': 'difficulties', 'value': user_data['difficulties_default'], 'textarea_only': False},
+            'agenda': {'field': 'agenda', 'value': user_data['agenda_default'], 'textarea_only': False}
+        }
+        result = driver.execute_script(FILL_TEXT_FIELDS_JS, FIELD_PATTERN, fill_values)
         
-        # Fill fields based on common patterns
-        filled_count = 0
-        for i, input_elem in enumerate(inputs):
-            try:
-                # Get the parent element to find labels
-                parent = input_elem.find_element(By.XPATH, "./ancestor::div[contains(@class, 'freebirdFormviewerComponentsQuestionBaseRoot')]")
-                question_text = parent.text.lower()
-                
-                # Fill based on question content
-                if any(keyword in question_text for keyword in ['name', 'naam']):
-                    input_elem.clear()
-                    input_elem.send_keys(user_data['name'])
-                    print(f"Filled name field: {user_data['name']}")
-                    filled_count += 1
-                    
-                elif any(keyword in question_text for keyword in ['work done', 'work', 'progress', 'today']):
-                    if input_elem.tag_name == 'textarea':
-                        input_elem.clear()
-                        input_elem.send_keys(work_done)
-                        print(f"Filled work done field")
-                        filled_count += 1
-                    
-                elif any(keyword in question_text for keyword in ['difficult', 'challenge', 'problem', 'issue']):
-                    input_elem.clear()
-                    input_elem.send_keys(user_data['difficulties_default'])
-                    print(f"Filled difficulties field: {user_data['difficulties_default']}")
-                    filled_count += 1
-                    
-                elif any(keyword in question_text for keyword in ['agenda', 'tomorrow', 'next', 'plan']):
-                    input_elem.clear()
-                    input_elem.send_keys(user_data['agenda_default'])
-                    print(f"Filled agenda field: {user_data['agenda_default']}")
-                    filled_count += 1
-                    
-            except Exception as e:
-                # Skip this input if we can't process it
-                continue
+        print(f"Found {result['count']} input fields")
+        for field in result['filled']:
+            print(f"Filled {field} field")
+        filled_count = len(result['filled'])
         
-        # Handle date fields
+        # Handle date fields (format today's values once for all inputs)
+        year, month, day = str(now.year), str(now.month), str(now.day)
+        iso_date = f"{now:%Y-%m-%d}"
         date_inputs = driver.find_elements(By.CSS_SELECTOR, "input[type='date'], input[aria-label*='year'], input[aria-label*='month'], input[aria-label*='day']")
         for date_input in date_inputs:
             try:
-                aria_label = date_input.get_attribute('aria-label', '').lower()
+                aria_label = (date_input.get_attribute('aria-label') or '').lower()
                 if 'year' in aria_label:
                     date_input.clear()
-                    date_input.send_keys(str(now.year))
+                    date_input.send_keys(year)
                 elif 'month' in aria_label:
                     date_input.clear()
-                    date_input.send_keys(str(now.month))
+                    date_input.send_keys(month)
                 elif 'day' in aria_label:
                     date_input.clear()
-                    date_input.send_keys(str(now.day))
+                    date_input.send_keys(day)
                 elif date_input.get_attribute('type') == 'date':
                     date_input.clear()
-                    date_input.send_keys(now.strftime('%Y-%m-%d'))
+                    date_input.send_keys(iso_date)
                 filled_count += 1
             except:
                 continue
@@ -224,17 +293,25 @@ def fill_form_selenium(driver, config):
         if submit_button:
             print("Submitting form...")
             driver.execute_script("arguments[0].scrollIntoView();", submit_button)
-            time.sleep(1)
+            try:
+                WebDriverWait(driver, 10, poll_frequency=0.1).until(EC.element_to_be_clickable(submit_button))
+            except TimeoutException:
+                print("ERROR: Submit button never became clickable")
+                return False
+            viewform_url = driver.current_url
             submit_button.click()
             
-            # Wait for submission to complete
-            time.sleep(3)
-            
-            # Check if we're on a success/confirmation page
-            current_url = driver.current_url
-            page_text = driver.page_source.lower()
+            # Wait until the viewform page is gone (so its own text can't
+            # match), then for the success/confirmation page
+            wait = WebDriverWait(driver, 10, poll_frequency=0.1)
+            try:
+                wait.until(EC.any_of(EC.staleness_of(submit_button), EC.url_changes(viewform_url)))
+                wait.until(_submission_confirmed)
+                confirmed = True
+            except TimeoutException:
+                confirmed = False
             
-            if 'formresponse' in current_url or any(word in page_text for word in ['submitted', 'thank you', 'received', 'response recorded']):
+            if confirmed:
                 print("SUCCESS: Form submitted successfully")
                 return True
             else:
@@ -247,20 +324,24 @@ def fill_form_selenium(driver, config):
     except TimeoutException:
         print("ERROR: Form took too long to load")
         return False
+    except (WebDriverException, urllib3.exceptions.HTTPError, ConnectionError) as e:
+        # The browser, its session or chromedriver itself may be gone (a dead
+        # chromedriver surfaces as urllib3's MaxRetryError); start fresh next time
+        print(f"ERROR: Browser error during form submission: {e}")
+        _reset_driver()
+        return False
     except Exception as e:
         print(f"ERROR: Exception during form submission: {e}")
         return False
 
 
-def submit_google_form_selenium(config):
-    """Main function to submit Google Form using Selenium."""
-    driver = None
-    try:
-        driver = setup_driver()
-        return fill_form_selenium(driver, config)
-    finally:
-        if driver:
-            driver.quit()
+def submit_google_form_selenium(config, work_done, productivity_rating, now):
+    """Main function to submit Google Form using Selenium.
+    
+    The browser is kept open for later submissions and closed at exit.
+    """
+    driver = setup_driver(config['form_config'].get('chromedriver_port', DEFAULT_CHROMEDRIVER_PORT))
+    return fill_form_selenium(driver, config, work_done, productivity_rating, now)
 
 
 if __name__ == "__main__":
@@ -271,8 +352,8 @@ if __name__ == "__main__":
     now = datetime.now()
     user_data = config['user_data']
     
-    print(f"Date: {now.strftime('%Y-%m-%d')}")
-    print(f"Time: {now.strftime('%H:%M:%S UTC')}")
+    print(f"Date: {now:%Y-%m-%d}")
+    print(f"Time: {now:%H:%M:%S UTC}")
     print(f"Submitter: {user_data['name']}")
     
     work_done = generate_work_done(config)
@@ -282,7 +363,11 @@ if __name__ == "__main__":
     productivity_rating = random.randint(rating_range['min'], rating_range['max'])
     print(f"Productivity Rating: {productivity_rating}/{rating_range['max']}")
     
-    print(f"\nSubmitting form using Selenium...")
-    
-    success = submit_google_form_selenium(config)
+    # Skip the browser entirely for forms that don't need JS to submit
+    if config['form_config'].get('use_selenium', True):
+        print(f"\nSubmitting form using Selenium...")
+        success = submit_google_form_selenium(config, work_done, productivity_rating, now)
+    else:
+        print(f"\nSubmitting form using requests (use_selenium disabled)...")
+        success = submit_google_form(config, work_done, productivity_rating, now)
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -8,6 +8,27 @@ import requests
 import json
 import os
 
+from submit_form import get_form_urls
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def find_field_ids(text, field_mappings):
+    """Return the names of the field mappings whose IDs appear in text."""
+    if ahocorasick is None:
+        return [name for name, field_id in field_mappings.items() if field_id in text]
+    
+    # Single pass over the page for all field IDs at once
+    automaton = ahocorasick.Automaton()
+    for name, field_id in field_mappings.items():
+        automaton.add_word(field_id, name)
+    automaton.make_automaton()
+    found = {name for _, name in automaton.iter(text)}
+    return [name for name in field_mappings if name in found]
+
 
 def test_form_access():
     """Test if we can access the form and get its structure."""
@@ -18,7 +39,7 @@ def test_form_access():
         config = json.load(f)
     
     form_url = config['form_config']['form_url']
-    form_view_url = form_url.replace('/formResponse', '/viewform')
+    form_view_url, _ = get_form_urls(form_url)
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -36,10 +57,7 @@ def test_form_access():
             
             # Check if our field mappings exist in the form
             field_mappings = config['form_config']['field_mappings']
-            found_fields = []
-            for field_name, field_id in field_mappings.items():
-                if field_id in response.text:
-                    found_fields.append(field_name)
+            found_fields = find_field_ids(response.text, field_mappings)
             
             print(f"Found {len(found_fields)}/{len(field_mappings)} field mappings:")
             for field in found_fields:
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Offline tests for submit_form.py's HTTP submission path.
+Runs against a local HTTP server, so no real form data is submitted.
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs
+
+import submit_form
+
+
+class FakeFormHandler(BaseHTTPRequestHandler):
+    """Slow viewform GET that sets a cookie, fast formResponse POST."""
+
+    get_delay = 0.5
+    # (Cookie header, body) of every POST received, shared across handler classes
+    posts = []
+
+    def do_GET(self):
+        time.sleep(self.get_delay)
+        body = b"<html>form</html>"
+        self.send_response(200)
+        self.send_header('Set-Cookie', 'NID=abc123; Path=/')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request_body = self.rfile.read(int(self.headers['Content-Length']))
+        cookie = self.headers.get('Cookie', '')
+        FakeFormHandler.posts.append((cookie, request_body))
+        status = self.post_status(cookie)
+        body = b"<html>submitted</html>"
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def post_status(self, cookie):
+        return 200
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CookieRequiredHandler(FakeFormHandler):
+    """Rejects any POST that arrives without the viewform's NID cookie."""
+
+    def post_status(self, cookie):
+        return 200 if 'NID=' in cookie else 403
+
+
+def make_config(base_url, speculative=True):
+    """Return a minimal config pointing at the local server."""
+    return {
+        'form_config': {
+            'form_url': f"{base_url}/forms/d/e/TEST/formResponse",
+            'field_mappings': {
+                'name': 'entry.1',
+                'work_done': 'entry.2',
+                'difficulties': 'entry.3',
+                'agenda': 'entry.4',
+                'date_year': 'entry.5_year',
+                'date_month': 'entry.5_month',
+                'date_day': 'entry.5_day',
+                'productivity_rating': 'entry.6'
+            },
+            'hidden_params': {'fbzx': '1', 'pageHistory': '0'},
+            'speculative': speculative
+        },
+        'user_data': {
+            'name': 'Test User',
+            'difficulties_default': 'NA',
+            'agenda_default': 'More tests'
+        }
+    }
+
+
+class SubmitGoogleFormTest(unittest.TestCase):
+
+    handler = FakeFormHandler
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), cls.handler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cookie_path = os.path.join(tmp.name, 'cookies.pkl')
+        patcher = mock.patch.object(submit_form, 'COOKIE_CACHE_PATH', self.cookie_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        submit_form.SESSION.cookies.clear()
+        self.addCleanup(submit_form.SESSION.cookies.clear)
+        FakeFormHandler.posts.clear()
+
+    def submit(self, config):
+        return submit_form.submit_google_form(config, "- Task", 4, datetime(2024, 1, 2))
+
+    def test_speculative_submit_caches_cookies_from_slow_get(self):
+        self.assertTrue(self.submit(make_config(self.base_url)))
+
+        with open(self.cookie_path, 'rb') as f:
+            self.assertEqual(pickle.load(f), {'NID': 'abc123'})
+
+    def test_post_body_has_static_and_daily_fields(self):
+        self.assertTrue(self.submit(make_config(self.base_url, speculative=False)))
+
+        # The server reads exactly Content-Length bytes, so a wrong length truncates this
+        fields = parse_qs(FakeFormHandler.posts[-1][1].decode(), strict_parsing=True)
+        self.assertEqual(fields, {
+            'entry.1': ['Test User'],
+            'entry.2': ['- Task'],
+            'entry.3': ['NA'],
+            'entry.4': ['More tests'],
+            'entry.5_year': ['2024'],
+            'entry.5_month': ['1'],
+            'entry.5_day': ['2'],
+            'entry.6': ['4'],
+            'fbzx': ['1'],
+            'pageHistory': ['0']
+        })
+
+    def test_sequential_submit_caches_cookies(self):
+        self.assertTrue(self.submit(make_config(self.base_url, speculative=False)))
+
+        with open(self.cookie_path, 'rb') as f:
+            self.assertEqual(pickle.load(f), {'NID': 'abc123'})
+
+    def test_empty_cookie_cache_is_ignored(self):
+        with open(self.cookie_path, 'wb') as f:
+            pickle.dump({}, f)
+
+        self.assertIsNone(submit_form._load_cookies())
+
+    def test_foreign_cookie_cache_is_ignored(self):
+        with open(self.cookie_path, 'wb') as f:
+            pickle.dump(['not', 'a', 'dict'], f)
+
+        self.assertIsNone(submit_form._load_cookies())
+
+
+class SpeculativeRejectedTest(SubmitGoogleFormTest):
+    """Same checks against a form that needs the viewform cookie to accept a POST."""
+
+    handler = CookieRequiredHandler
+
+    def test_rejected_speculative_post_is_resent_with_cookie(self):
+        self.assertTrue(self.submit(make_config(self.base_url)))
+
+        self.assertEqual(len(FakeFormHandler.posts), 2)
+        self.assertNotIn('NID=', FakeFormHandler.posts[0][0])
+        self.assertIn('NID=abc123', FakeFormHandler.posts[1][0])
+
+
+if __name__ == "__main__":
+    unittest.main()